@@ -12,6 +12,9 @@ Default extractor is heuristic (offline). To plug in an LLM:
 """
 
 import argparse
+import atexit
+import codecs
+import functools
 import hashlib
 import json
 import logging
@@ -20,10 +23,27 @@ import re
 import sqlite3
 import sys
 import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import ahocorasick  # optional: pyahocorasick for single-pass literal keyword matching
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson  # optional: faster JSON output
+except ImportError:
+    orjson = None
+
+try:
+    import re2  # optional: google-re2 for linear-time keyword set matching
+except ImportError:
+    re2 = None
 
 
 # -----------------------------
@@ -57,22 +77,59 @@ def read_text_file(path: str) -> str:
         return f.read().strip()
 
 
-def read_stdin() -> str:
-    return sys.stdin.read().strip()
+DEFAULT_MAX_INPUT_BYTES = 1024 * 1024
+
+
+def _normalize_newlines(text: str) -> str:
+    # Binary reads skip universal-newline translation; keep hashes and excerpts CRLF-agnostic.
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+def _decode_bounded(data: bytes, max_bytes: int, logger: logging.Logger) -> str:
+    if len(data) <= max_bytes:
+        return _normalize_newlines(data.decode("utf-8"))
+    logger.warning(f"Input exceeds {max_bytes} bytes; only the first {max_bytes} bytes are processed.")
+    # Incremental decode with final=False drops a codepoint cut in half at the limit.
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    return _normalize_newlines(decoder.decode(data[:max_bytes], final=False))
+
+
+def read_input_text(path: Optional[str], max_bytes: int, logger: logging.Logger) -> str:
+    """Read lead text from a file (or stdin when path is None), capped at max_bytes."""
+    if path is None:
+        return _decode_bounded(sys.stdin.buffer.read(max_bytes + 1), max_bytes, logger)
+    with open(path, "rb") as f:
+        return _decode_bounded(f.read(max_bytes + 1), max_bytes, logger)
 
 
 def ensure_dir(p: str) -> None:
-    Path(p).mkdir(parents=True, exist_ok=True)
+    os.makedirs(p, exist_ok=True)
+
+
+def json_bytes(data: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        # Same layout as json.dumps(indent=2, ensure_ascii=False), serialized in C.
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_bytes(path: str, data: bytes) -> None:
+    # Raw fd write: no Python file object or text-layer encoding per output file.
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 
 def write_json(path: str, data: Dict[str, Any]) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_bytes(path, json_bytes(data))
 
 
 def write_text(path: str, text: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(text)
+    write_bytes(path, text.encode("utf-8"))
 
 
 # -----------------------------
@@ -82,24 +139,77 @@ EMAIL_RE = re.compile(r"\b[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}\b", re.IGNORECAS
 PHONE_RE = re.compile(r"(?:(?:\+?86)?\s*)?(?:1[3-9]\d{9})\b|(?:\b\d{3}[-\s]?\d{3}[-\s]?\d{4}\b)")
 IDCN_RE = re.compile(r"\b\d{17}[\dXx]\b")
 
-def redact_pii(text: str) -> Tuple[str, bool]:
-    redacted = text
-    hit = False
+PII_RE = re.compile(
+    rf"(?P<EMAIL>{EMAIL_RE.pattern})|(?P<PHONE>{PHONE_RE.pattern})|(?P<ID>{IDCN_RE.pattern})",
+    re.IGNORECASE,
+)
+PII_REPLACEMENTS = {
+    "EMAIL": "[REDACTED_EMAIL]",
+    "PHONE": "[REDACTED_PHONE]",
+    "ID": "[REDACTED_ID]",
+}
+LOCAL_PART_TAIL_RE = re.compile(r"[A-Z0-9._%+-]*@", re.IGNORECASE)
+# Every PII pattern needs an "@" or a run of 3+ digits; keep in sync with the patterns above.
+PII_SCREEN_RE = re.compile(r"@|\d{3}")
+
+
+def _email_within(text: str, start: int, end: int) -> Optional[re.Match]:
+    # A phone-like run can be the local part of an address (13812345678@qq.com);
+    # redact the whole address in that case, as email used to be scrubbed first.
+    if not LOCAL_PART_TAIL_RE.match(text, end):
+        return None
+    for i in range(start, end):
+        m = EMAIL_RE.match(text, i)
+        if m:
+            return m
+    return None
 
-    def _sub(pattern: re.Pattern, repl: str, s: str) -> Tuple[str, bool]:
-        new_s, n = pattern.subn(repl, s)
-        return new_s, (n > 0)
 
-    redacted, h = _sub(EMAIL_RE, "[REDACTED_EMAIL]", redacted); hit = hit or h
-    redacted, h = _sub(PHONE_RE, "[REDACTED_PHONE]", redacted); hit = hit or h
-    redacted, h = _sub(IDCN_RE, "[REDACTED_ID]", redacted); hit = hit or h
-    return redacted, hit
+def redact_pii(text: str) -> Tuple[str, bool]:
+    # Cheap screen first: most chat text has no PII and skips the full alternation.
+    if not PII_SCREEN_RE.search(text):
+        return text, False
+    parts: List[str] = []
+    pos = 0
+    m = PII_RE.search(text)
+    while m:
+        kind = m.lastgroup
+        if kind == "PHONE":
+            email = _email_within(text, m.start(), m.end())
+            if email:
+                m, kind = email, "EMAIL"
+            # An ID-shaped run glued to the phone number only gains its trailing
+            # boundary once the phone is replaced; redact it as well.
+            id_start = m.start() - 18
+            if kind == "PHONE" and id_start >= pos and IDCN_RE.fullmatch(text, id_start, m.start()):
+                parts.append(text[pos:id_start])
+                parts.append(PII_REPLACEMENTS["ID"])
+                pos = id_start + 18
+        parts.append(text[pos:m.start()])
+        parts.append(PII_REPLACEMENTS[kind])
+        pos = m.end()
+        m = PII_RE.search(text, pos)
+    if not parts:
+        return text, False
+    parts.append(text[pos:])
+    return "".join(parts), True
 
 
 def text_sha256(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
+def log_hash_backend(logger: logging.Logger) -> None:
+    # OpenSSL-backed hashlib picks SHA-NI / ARMv8 crypto extensions at runtime;
+    # the builtin fallback (Python built without OpenSSL) is several times slower.
+    if hashlib.sha256.__name__.startswith("openssl_"):
+        if logger.isEnabledFor(logging.DEBUG):
+            import ssl
+            logger.debug(f"sha256 backend: {ssl.OPENSSL_VERSION}")
+    else:
+        logger.warning("sha256 backend: builtin (Python not linked against OpenSSL); hashing is not hardware-accelerated")
+
+
 # -----------------------------
 # Extraction (heuristic default)
 # -----------------------------
@@ -112,11 +222,25 @@ def call_llm(prompt: str) -> str:
     return "{}"
 
 
-def find_first(text: str, patterns: List[str]) -> Optional[str]:
-    for p in patterns:
-        m = re.search(p, text, flags=re.IGNORECASE)
+# Set to a Counter (run --profile-patterns) to record which pattern index answers each field.
+PATTERN_HITS: Optional[Counter] = None
+
+
+def find_first(text: str, field: "FieldPatterns", text_lower: Optional[str] = None) -> Optional[str]:
+    # Pattern order is priority, so it is never reordered; a literal guard skips the
+    # full-text regex scan for patterns that cannot match.
+    if text_lower is None:
+        text_lower = text.lower()
+    for i, (p, guard) in enumerate(zip(field.patterns, field.guards)):
+        if not any(lit in text_lower for lit in guard):
+            continue
+        m = p.search(text)
         if m:
+            if PATTERN_HITS is not None:
+                PATTERN_HITS[(field.name, i)] += 1
             return m.group(1).strip()
+    if PATTERN_HITS is not None:
+        PATTERN_HITS[(field.name, None)] += 1
     return None
 
 
@@ -146,6 +270,199 @@ def looks_like_company_name(s: str) -> bool:
     return any(candidate.endswith(suf) for suf in suffixes)
 
 
+@dataclass(frozen=True)
+class FieldPatterns:
+    """
+    Ordered capture patterns for one field (earlier patterns win).
+    guards[i] lists lowercase literals of which at least one must occur for
+    patterns[i] to match; find_first checks them with str 'in' before running the regex.
+    """
+    name: str
+    patterns: Tuple[re.Pattern, ...]
+    guards: Tuple[Tuple[str, ...], ...]
+
+
+# Patterns are compiled once at import so repeated extractions skip re's cache lookup.
+def _field_patterns(name: str, *entries: Tuple[Tuple[str, ...], str]) -> FieldPatterns:
+    return FieldPatterns(
+        name=name,
+        patterns=tuple(re.compile(p, re.IGNORECASE) for _, p in entries),
+        guards=tuple(guard for guard, _ in entries),
+    )
+
+
+ACCOUNT_PATS = _field_patterns(
+    "account",
+    (("客户",), r"客户[:：]\s*([^\n（]+)"),
+    (("company",), r"Company[:：]\s*([^\n]+)"),
+)
+BUSINESS_MODEL_PATS = _field_patterns(
+    "business_model",
+    (("b2b", "b2c"), r"\b(B2B|B2C)\b"),
+    (("b2b", "b2c"), r"（\s*(B2B|B2C)\b"),
+)
+INDUSTRY_PATS = _field_patterns(
+    "industry",
+    (("b2b", "b2c"), r"（\s*(?:B2B|B2C)\s*([^\)）]+)[）\)]"),   # e.g., （B2B 医疗器械）
+    (("我们是",), r"我们是[^\n]*?一家([^\n，。;；]+?)(?:公司|企业|集团|机构|团队)"),
+    (("行业",), r"行业[:：]\s*([^\n]+)"),
+)
+BUDGET_PATS = _field_patterns(
+    "budget",
+    (("预算",), r"[-•]\s*预算[:：]\s*([^\n]+)"),
+    (("预算",), r"预算[:：]\s*([^\n]+)"),
+    (("budget",), r"budget[:：]\s*([^\n]+)"),
+)
+TIMELINE_PATS = _field_patterns(
+    "timeline",
+    (("时间线",), r"[-•]\s*时间线[:：]\s*([^\n]+)"),
+    (("时间线",), r"时间线[:：]\s*([^\n]+)"),
+    (("timeline",), r"timeline[:：]\s*([^\n]+)"),
+    (("周内", "个月", "本月", "下月", "q1", "q2", "q3", "q4"), r"(2\s*周内|1-2\s*个月|两周内|本月|下月|Q[1-4])"),
+)
+URGENCY_PATS = _field_patterns(
+    "urgency",
+    (("越快越好", "尽快", "asap", "as soon as possible"), r"(越快越好|尽快|ASAP|as soon as possible)"),
+)
+
+ENTERPRISE_RE = re.compile(r"(\bCRM\b|销售效率|流程|复盘|看数据|dashboard)", re.IGNORECASE)
+LEADERSHIP_MARKER_RE = re.compile(r"(领导|管理层|management)", re.IGNORECASE)
+SALESFORCE_RE = re.compile(r"\bSalesforce\b", re.IGNORECASE)
+CRM_NEGATED_RE = re.compile(r"(没有|无|未用|不用|不使用).{0,6}CRM")
+
+# Simple keyword buckets
+PAIN_KW = [
+    "手动",
+    "低效",
+    "遗漏",
+    "数据不一致",
+    "分散",
+    "节奏很乱",
+    "未跟进",
+    "不太爱填",
+    "很乱",
+    "manual",
+    "slow",
+    "漏跟进",
+    "麻烦",
+]
+MUST_KW = [
+    "自动化",
+    "workflow",
+    "tracking",
+    "数据追踪",
+    "CRM",
+    "Salesforce",
+    "发票",
+    "invoice",
+    "dashboard",
+    "提醒",
+    "超过48小时未跟进",
+    "会后总结",
+    "复盘",
+    "英文",
+    "email",
+    "邮箱",
+    "WhatsApp",
+    "微信",
+    "导出 Excel/CSV",
+    "导出Excel/CSV",
+]
+NICE_KW = ["同步", "集成", "导出", "Slack", "企微", "飞书", "小程序", "bot"]
+STAKEHOLDER_KW = ["CEO", "CTO", "采购", "财务", "运营", "销售总监", "老板", "procurement", "finance", "ops", "sales"]
+LEADERSHIP_KW = ["领导", "管理层", "总监", "management", "manager", "director"]
+# Only used to derive use_case; never reported as a field.
+USE_CASE_KW = ["跟进提醒"]
+
+KEYWORD_BUCKETS: Dict[str, List[str]] = {
+    "pain": PAIN_KW,
+    "must": MUST_KW,
+    "nice": NICE_KW,
+    "stakeholder": STAKEHOLDER_KW,
+    "leadership": LEADERSHIP_KW,
+    "use_case": USE_CASE_KW,
+}
+# Stakeholder keywords folded into the single reporting-stakeholder entry, resolved once here.
+REPORTING_KW = frozenset(
+    kw for kws in (STAKEHOLDER_KW, LEADERSHIP_KW) for kw in kws if LEADERSHIP_MARKER_RE.search(kw)
+)
+
+
+def _build_keyword_alternation() -> Tuple[re.Pattern, Dict[str, Tuple[Tuple[str, str], ...]]]:
+    # Pure-re fallback: one alternation over every bucket, longest first inside a
+    # lookahead so each start offset reports its longest keyword. Keywords that are a
+    # prefix of that hit (e.g. "导出" for "导出Excel/CSV") are resolved from a table
+    # built here, so a scan costs one pass over the text and no per-keyword loop.
+    entries = [(kw.lower(), (bucket, kw)) for bucket, kws in KEYWORD_BUCKETS.items() for kw in kws]
+    alts = sorted({key for key, _ in entries}, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(re.escape(a) for a in alts) + "))", re.IGNORECASE)
+    prefixes = {
+        longer: tuple(hit for key, hit in entries if longer.startswith(key))
+        for longer in alts
+    }
+    return pattern, prefixes
+
+
+_KW_ALT, _KW_ALT_PREFIXES = _build_keyword_alternation()
+
+
+def _build_keyword_automaton() -> Any:
+    # Keywords are pure literals: one Aho-Corasick pass over the lowercased text finds them all.
+    automaton = ahocorasick.Automaton()
+    for bucket, kws in KEYWORD_BUCKETS.items():
+        for kw in kws:
+            key = kw.lower()
+            automaton.add_word(key, automaton.get(key, ()) + ((bucket, kw),))
+    automaton.make_automaton()
+    return automaton
+
+
+def _build_keyword_set() -> Tuple[Any, List[Tuple[str, str]]]:
+    # One RE2 set over every bucket; Match() returns the ids of all keywords present.
+    opts = re2.Options()
+    opts.case_sensitive = False
+    opts.literal = True
+    kw_set = re2.Set.SearchSet(opts)
+    ids: List[Tuple[str, str]] = []
+    for bucket, kws in KEYWORD_BUCKETS.items():
+        for kw in kws:
+            kw_set.Add(kw)
+            ids.append((bucket, kw))
+    kw_set.Compile()
+    return kw_set, ids
+
+
+_KW_AUTOMATON = _build_keyword_automaton() if ahocorasick is not None else None
+_KW_SET, _KW_SET_IDS = _build_keyword_set() if (re2 is not None and _KW_AUTOMATON is None) else (None, [])
+
+
+def _keyword_hits(text: str) -> Set[Tuple[str, str]]:
+    if _KW_AUTOMATON is not None:
+        return {hit for _, hits in _KW_AUTOMATON.iter(text.lower()) for hit in hits}
+    if _KW_SET is not None:
+        return {_KW_SET_IDS[i] for i in (_KW_SET.Match(text) or ())}
+    found = {m.group(1).lower() for m in _KW_ALT.finditer(text)}
+    return {hit for key in found for hit in _KW_ALT_PREFIXES.get(key, ())}
+
+
+def scan_keywords(text: str) -> Dict[str, List[str]]:
+    """Return matched keywords per bucket, each list in declared order."""
+    hits = _keyword_hits(text)
+    return {bucket: [kw for kw in kws if (bucket, kw) in hits] for bucket, kws in KEYWORD_BUCKETS.items()}
+
+
+# (signal key, predicate over that signal's value, question); order is the output order.
+OPEN_QUESTION_RULES: Tuple[Tuple[str, Callable[[Any], bool], str], ...] = (
+    ("account_name", lambda v: not v, "Company name?（公司名称？）"),
+    ("industry", lambda v: not v or v == "Unknown", "Industry?（行业？）"),
+    ("business_model_unknown", bool, "B2B or B2C?（B2B 还是 B2C？）"),
+    ("crm_question_needed", bool, "Which CRM are you using?（目前用的 CRM 是什么？）"),
+    ("budget", lambda v: not v, "Budget range?（预算范围？）"),
+    ("timeline", lambda v: not v, "Target timeline?（期望上线时间？）"),
+    ("stakeholders", lambda v: not v, "Decision makers involved?（决策链角色？）"),
+)
+
+
 def heuristic_extract(text: str) -> Dict[str, Any]:
     """
     Heuristic extractor (offline):
@@ -153,142 +470,69 @@ def heuristic_extract(text: str) -> Dict[str, Any]:
     - Extract industry detail from patterns like "（B2B 医疗器械）"
     - Classify 'bot' as Nice-to-have by default
     """
-    account = find_first(text, [
-        r"客户[:：]\s*([^\n（]+)",
-        r"Company[:：]\s*([^\n]+)"
-    ])
+    keywords = scan_keywords(text)
+    pain_points = keywords["pain"]
+    must_haves = keywords["must"]
+    nice_to_haves = keywords["nice"]
+    # Leadership signal: the leadership bucket plus 老板 from the stakeholder bucket.
+    leadership_hit = bool(keywords["leadership"]) or "老板" in keywords["stakeholder"]
+
+    text_lower = text.lower()
+    account = find_first(text, ACCOUNT_PATS, text_lower)
     if account and not looks_like_company_name(account):
         account = None
 
     # Business model (B2B/B2C) and industry detail (e.g., 医疗器械)
-    business_model = find_first(text, [
-        r"\b(B2B|B2C)\b",
-        r"（\s*(B2B|B2C)\b"
-    ]) or "Unknown"
+    business_model = find_first(text, BUSINESS_MODEL_PATS, text_lower) or "Unknown"
     business_model_unknown = business_model == "Unknown"
     business_model_inferred = False
     if business_model_unknown:
-        leadership_hit = re.search(r"(领导|管理层|老板|总监|management|manager|director)", text, flags=re.IGNORECASE)
-        enterprise_hit = re.search(r"(\bCRM\b|销售效率|流程|复盘|看数据|dashboard)", text, flags=re.IGNORECASE)
-        if leadership_hit and enterprise_hit:
+        if leadership_hit and ENTERPRISE_RE.search(text):
             business_model = "Likely B2B (inferred)"
             business_model_inferred = True
 
-    industry_detail = find_first(text, [
-        r"（\s*(?:B2B|B2C)\s*([^\)）]+)[）\)]",   # e.g., （B2B 医疗器械）
-        r"我们是[^\n]*?一家([^\n，。;；]+?)(?:公司|企业|集团|机构|团队)",
-        r"行业[:：]\s*([^\n]+)"
-    ])
+    industry_detail = find_first(text, INDUSTRY_PATS, text_lower)
 
     industry = industry_detail.strip() if industry_detail else "Unknown"
 
     # Prefer explicit bullet lines under sections like "预算/时间线："
-    budget = find_first(text, [
-        r"[-•]\s*预算[:：]\s*([^\n]+)",
-        r"预算[:：]\s*([^\n]+)",
-        r"budget[:：]\s*([^\n]+)"
-    ])
-
-    timeline = find_first(text, [
-        r"[-•]\s*时间线[:：]\s*([^\n]+)",
-        r"时间线[:：]\s*([^\n]+)",
-        r"timeline[:：]\s*([^\n]+)",
-        r"(2\s*周内|1-2\s*个月|两周内|本月|下月|Q[1-4])"
-    ])
+    budget = find_first(text, BUDGET_PATS, text_lower)
+
+    timeline = find_first(text, TIMELINE_PATS, text_lower)
     if not timeline:
-        urgency = find_first(text, [
-            r"(越快越好|尽快|ASAP|as soon as possible)"
-        ])
+        urgency = find_first(text, URGENCY_PATS, text_lower)
         if urgency:
             timeline = "ASAP（越快越好）"
 
-    # Simple keyword buckets
-    pain_kw = [
-        "手动",
-        "低效",
-        "遗漏",
-        "数据不一致",
-        "分散",
-        "节奏很乱",
-        "未跟进",
-        "不太爱填",
-        "很乱",
-        "manual",
-        "slow",
-        "漏跟进",
-        "麻烦",
-    ]
-    must_kw = [
-        "自动化",
-        "workflow",
-        "tracking",
-        "数据追踪",
-        "CRM",
-        "Salesforce",
-        "发票",
-        "invoice",
-        "dashboard",
-        "提醒",
-        "超过48小时未跟进",
-        "会后总结",
-        "复盘",
-        "英文",
-        "email",
-        "邮箱",
-        "WhatsApp",
-        "微信",
-        "导出 Excel/CSV",
-        "导出Excel/CSV",
-    ]
-    nice_kw = ["同步", "集成", "导出", "Slack", "企微", "飞书", "小程序", "bot"]
-
-    pain_points = [kw for kw in pain_kw if re.search(re.escape(kw), text, flags=re.IGNORECASE)]
-    must_haves = [kw for kw in must_kw if re.search(re.escape(kw), text, flags=re.IGNORECASE)]
-    nice_to_haves = [kw for kw in nice_kw if re.search(re.escape(kw), text, flags=re.IGNORECASE)]
-    crm_mentioned = re.search(r"\bCRM\b", " ".join(must_haves), flags=re.IGNORECASE)
-    crm_known = re.search(r"\bSalesforce\b", text, flags=re.IGNORECASE)
-    crm_negated = re.search(r"(没有|无|未用|不用|不使用).{0,6}CRM", text)
+    crm_mentioned = "CRM" in must_haves
+    crm_known = SALESFORCE_RE.search(text)
+    crm_negated = CRM_NEGATED_RE.search(text)
     crm_question_needed = business_model_inferred or (
         crm_mentioned and not crm_known and not crm_negated
     )
 
-    stakeholders = []
-    for kw in ["CEO", "CTO", "采购", "财务", "运营", "销售总监", "老板", "procurement", "finance", "ops", "sales"]:
-        if re.search(re.escape(kw), text, flags=re.IGNORECASE):
-            stakeholders.append(kw)
+    stakeholders = list(keywords["stakeholder"])
     if not stakeholders:
-        for kw in ["领导", "管理层", "总监", "management", "manager", "director"]:
-            if re.search(re.escape(kw), text, flags=re.IGNORECASE):
-                stakeholders.append(kw)
-    leadership_marker = re.compile(r"(领导|管理层|management)", flags=re.IGNORECASE)
-    if any(leadership_marker.search(s) for s in stakeholders):
-        stakeholders = [s for s in stakeholders if not leadership_marker.search(s)]
+        stakeholders = list(keywords["leadership"])
+    if REPORTING_KW.intersection(stakeholders):
+        stakeholders = [s for s in stakeholders if s not in REPORTING_KW]
         stakeholders.append("领导/管理层（Reporting stakeholder）")
 
-    open_questions = []
-    if not account:
-        open_questions.append("Company name?（公司名称？）")
-    if not industry or industry == "Unknown":
-        open_questions.append("Industry?（行业？）")
-    if business_model_unknown:
-        open_questions.append("B2B or B2C?（B2B 还是 B2C？）")
-    if crm_question_needed:
-        open_questions.append("Which CRM are you using?（目前用的 CRM 是什么？）")
-    if not budget:
-        open_questions.append("Budget range?（预算范围？）")
-    if not timeline:
-        open_questions.append("Target timeline?（期望上线时间？）")
-    if not stakeholders:
-        open_questions.append("Decision makers involved?（决策链角色？）")
+    signals = {
+        "account_name": account,
+        "industry": industry,
+        "business_model_unknown": business_model_unknown,
+        "crm_question_needed": crm_question_needed,
+        "budget": budget,
+        "timeline": timeline,
+        "stakeholders": stakeholders,
+    }
+    open_questions = [question for key, needed, question in OPEN_QUESTION_RULES if needed(signals[key])]
 
     use_case = "Sales workflow automation"
-    if re.search(r"发票|invoice", text, flags=re.IGNORECASE):
+    if "发票" in must_haves or "invoice" in must_haves:
         use_case = "Sales workflow + invoice checks"
-    if (
-        re.search(r"会后总结", text)
-        and re.search(r"跟进提醒", text)
-        and re.search(r"(领导|管理层|老板|总监|management|manager|director)", text, flags=re.IGNORECASE)
-    ):
+    if "会后总结" in must_haves and keywords["use_case"] and leadership_hit:
         use_case = "Sales workflow + meeting summary + follow-up reminders + reporting"
 
     return {
@@ -306,7 +550,66 @@ def heuristic_extract(text: str) -> Dict[str, Any]:
     }
 
 
-def extract_fields(text: str, schema_json: str, cfg: Dict[str, Any], logger: logging.Logger) -> Dict[str, Any]:
+# Hash of this module's source (patterns, keyword tables, heuristics), computed once at
+# import: any code change invalidates cached extractions without a manual version bump.
+EXTRACT_CODE_HASH = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+EXTRACT_MEMO_SIZE = 256
+_extract_memo: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+
+
+def extract_cache_key(text: str, schema_json: str, cfg: Dict[str, Any]) -> Tuple[str, str, str]:
+    cfg_json = json.dumps({"code": EXTRACT_CODE_HASH, "config": cfg}, sort_keys=True, ensure_ascii=False)
+    return text_sha256(text), text_sha256(schema_json), text_sha256(cfg_json)
+
+
+def _memo_put(key: Tuple[str, str, str], fields_json: str) -> None:
+    _extract_memo[key] = fields_json
+    _extract_memo.move_to_end(key)
+    if len(_extract_memo) > EXTRACT_MEMO_SIZE:
+        _extract_memo.popitem(last=False)
+
+
+def extract_fields(
+    text: str,
+    schema_json: str,
+    cfg: Dict[str, Any],
+    logger: logging.Logger,
+    db_path: str = "",
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Cached wrapper around _extract_uncached:
+    - in-process LRU keyed by (text_hash, schema_hash, config_hash)
+    - persisted in the tracking DB when db_path is given, so re-runs skip extraction
+    - use_cache=False always re-extracts and leaves both caches untouched
+    """
+    if not use_cache:
+        return _extract_uncached(text, schema_json, cfg)
+    key = extract_cache_key(text, schema_json, cfg)
+    fields_json = _extract_memo.get(key)
+    if fields_json is None and db_path:
+        # The cache only saves time: a locked or broken DB must not fail the lead.
+        try:
+            fields_json = fetch_cached_fields(db_path, key)
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache read skipped: {e}")
+    if fields_json is not None:
+        logger.debug(f"Extraction cache hit: {key[0][:12]}")
+        _memo_put(key, fields_json)
+        return json.loads(fields_json)
+
+    merged = _extract_uncached(text, schema_json, cfg)
+    fields_json = json.dumps(merged, ensure_ascii=False)
+    _memo_put(key, fields_json)
+    if db_path:
+        try:
+            store_cached_fields(db_path, key, fields_json)
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache write skipped: {e}")
+    return merged
+
+
+def _extract_uncached(text: str, schema_json: str, cfg: Dict[str, Any]) -> Dict[str, Any]:
     # Try LLM (stub) then merge with heuristic
     prompt = f"""You are a sales ops assistant. Extract structured lead info in JSON.
 Schema:
@@ -340,17 +643,23 @@ Return JSON only.
 # -----------------------------
 # Scoring & Stage
 # -----------------------------
+# Lowercased must-have keywords (see MUST_KW) that drive scoring and actions.
+AUTOMATION_TRACKING_KW = frozenset({"自动化", "tracking", "数据追踪", "workflow", "dashboard"})
+INVOICE_KW = frozenset({"发票", "invoice"})
+
+
 def score_and_stage(fields: Dict[str, Any], cfg: Dict[str, Any]) -> Dict[str, Any]:
     sc = cfg.get("scoring", {})
+    mh_lower = {m.lower() for m in fields.get("must_haves", [])}
     fit = int(sc.get("base_fit", 50))
     intent = int(sc.get("base_intent", 50))
 
     # Fit signals
     if fields.get("industry") and fields["industry"] != "Unknown":
         fit += int(sc.get("fit_industry_known", 10))
-    if re.search(r"\bSalesforce\b", " ".join(fields.get("must_haves", [])), flags=re.IGNORECASE):
+    if "salesforce" in mh_lower:
         fit += int(sc.get("fit_crm_salesforce", 10))
-    if any(k in " ".join(fields.get("must_haves", [])) for k in ["自动化", "tracking", "数据追踪", "workflow", "dashboard"]):
+    if AUTOMATION_TRACKING_KW & mh_lower:
         fit += int(sc.get("fit_mentions_automation_tracking", 10))
 
     # Intent signals
@@ -389,27 +698,46 @@ def generate_actions(fields: Dict[str, Any], scores: Dict[str, Any]) -> List[str
         "Schedule a 20-min discovery call to validate requirements（安排需求澄清电话）",
         "Share a short workflow prototype outline + expected data fields（发送流程原型大纲与字段清单）"
     ]
-    crm_mentioned = re.search(r"\bCRM\b", " ".join(fields.get("must_haves", [])), flags=re.IGNORECASE)
+    mh_lower = {m.lower() for m in fields.get("must_haves", [])}
+    crm_mentioned = "crm" in mh_lower
     if crm_mentioned or fields.get("business_model") == "Likely B2B (inferred)":
         actions.insert(0, "Confirm current CRM and data sources（确认当前 CRM 与数据来源/字段）")
-    if re.search(r"发票|invoice", " ".join(fields.get("must_haves", [])), flags=re.IGNORECASE):
+    if INVOICE_KW & mh_lower:
         actions.append("Collect 3–5 sample invoices to define validation rules（收集样例发票定义校验规则）")
     if scores["stage"].startswith("SQL"):
         actions.insert(0, "Propose a POC scope & timeline this week（本周给出 POC 范围与时间线）")
     return actions
 
 
+# (Chinese label, English label) for each key-point bullet, in email order.
+EMAIL_FIELD_LABELS = (
+    ("行业", "Industry"),
+    ("业务类型", "Segment"),
+    ("痛点", "Pain points"),
+    ("关键需求", "Must-haves"),
+    ("可选项", "Nice-to-haves"),
+    ("预算", "Budget"),
+    ("时间线", "Timeline"),
+)
+
+
+def _email_field_entries(fields: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    nice_to_haves = fields.get("nice_to_haves")
+    values = (
+        fields.get("industry"),
+        fields.get("business_model", "Unknown"),
+        ", ".join(fields.get("pain_points", [])),
+        ", ".join(fields.get("must_haves", [])),
+        ", ".join(nice_to_haves) if nice_to_haves else "None",
+        fields.get("budget"),
+        fields.get("timeline"),
+    )
+    return [(zh, en, str(value)) for (zh, en), value in zip(EMAIL_FIELD_LABELS, values)]
+
+
 def generate_followup_email(fields: Dict[str, Any], scores: Dict[str, Any], owner: str, lang: str) -> str:
     # Minimal bilingual option
-    bullets = [
-        f"行业/Industry: {fields.get('industry')}",
-        f"业务类型/Segment: {fields.get('business_model', 'Unknown')}",
-        f"痛点/Pain points: {', '.join(fields.get('pain_points', []))}",
-        f"关键需求/Must-haves: {', '.join(fields.get('must_haves', []))}",
-        f"可选项/Nice-to-haves: {', '.join(fields.get('nice_to_haves', [])) if fields.get('nice_to_haves') else 'None'}",
-        f"预算/Budget: {fields.get('budget')}",
-        f"时间线/Timeline: {fields.get('timeline')}",
-    ]
+    entries = _email_field_entries(fields)
     actions = generate_actions(fields, scores)
     questions = fields.get("open_questions", [])
 
@@ -424,7 +752,7 @@ def generate_followup_email(fields: Dict[str, Any], scores: Dict[str, Any], owne
             "Hi there / 你好，",
             "",
             "Thanks for sharing your context. I captured the key points below / 感谢分享需求背景，关键信息如下：",
-            *[f"- {b}" for b in bullets],
+            *[f"- {zh}/{en}: {value}" for zh, en, value in entries],
             "",
             "Proposed next steps / 建议下一步：",
             *[f"{i+1}) {a}" for i, a in enumerate(actions[:3])],
@@ -446,7 +774,7 @@ def generate_followup_email(fields: Dict[str, Any], scores: Dict[str, Any], owne
         "你好，",
         "",
         "感谢分享需求背景。我先把关键信息整理如下：",
-        *[f"- {b.split(':',1)[0]}：{b.split(':',1)[1].strip()}" for b in bullets],
+        *[f"- {zh}/{en}：{value.strip()}" for zh, en, value in entries],
         "",
         "建议下一步：",
         *[f"{i+1}) {a}" for i, a in enumerate(actions[:3])],
@@ -505,10 +833,7 @@ def build_report_md(fields: Dict[str, Any], scores: Dict[str, Any], actions: Lis
 # -----------------------------
 # Tracking DB
 # -----------------------------
-def init_db(db_path: str) -> None:
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("""
+SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS lead_runs (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   run_ts TEXT NOT NULL,
@@ -523,135 +848,403 @@ CREATE TABLE IF NOT EXISTS lead_runs (
   stage TEXT,
   out_dir TEXT
 );
-""")
-    conn.commit()
-    conn.close()
-
+CREATE TABLE IF NOT EXISTS _extract_cache (
+  text_hash TEXT NOT NULL,
+  schema_hash TEXT NOT NULL,
+  config_hash TEXT NOT NULL,
+  fields_json TEXT NOT NULL,
+  created_ts TEXT NOT NULL,
+  PRIMARY KEY (text_hash, schema_hash, config_hash)
+);
+"""
 
-def insert_run(db_path: str, record: Dict[str, Any]) -> None:
-    init_db(db_path)
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("""
+INSERT_RUN_SQL = """
 INSERT INTO lead_runs
 (run_ts, lead_id, input_source, account_name, industry, budget, timeline, fit_score, intent_score, stage, out_dir)
 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-""", (
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _get_conn(db_path: str) -> sqlite3.Connection:
+    # One connection per DB per process: WAL + NORMAL sync turns each run into a
+    # single WAL append instead of a connect/commit/close cycle per statement.
+    # Unbounded on purpose: an evicted entry would leave its connection open until exit.
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.executescript(SCHEMA_SQL)
+    atexit.register(conn.close)
+    return conn
+
+
+def init_db(db_path: str) -> None:
+    _get_conn(db_path)
+
+
+def _run_row(record: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
         record["run_ts"], record["lead_id"], record["input_source"],
         record.get("account_name"), record.get("industry"),
         record.get("budget"), record.get("timeline"),
         record.get("fit_score"), record.get("intent_score"),
         record.get("stage"), record.get("out_dir")
-    ))
-    conn.commit()
-    conn.close()
+    )
+
+
+def insert_run(db_path: str, record: Dict[str, Any]) -> None:
+    conn = _get_conn(db_path)
+    with conn:
+        conn.execute(INSERT_RUN_SQL, _run_row(record))
+
+
+def insert_runs_batch(db_path: str, records: List[Dict[str, Any]]) -> None:
+    conn = _get_conn(db_path)
+    with conn:
+        conn.executemany(INSERT_RUN_SQL, [_run_row(r) for r in records])
+
+
+def fetch_cached_fields(db_path: str, key: Tuple[str, str, str]) -> Optional[str]:
+    row = _get_conn(db_path).execute("""
+SELECT fields_json FROM _extract_cache
+WHERE text_hash = ? AND schema_hash = ? AND config_hash = ?
+""", key).fetchone()
+    return row[0] if row else None
+
+
+def store_cached_fields(db_path: str, key: Tuple[str, str, str], fields_json: str) -> None:
+    conn = _get_conn(db_path)
+    with conn:
+        conn.execute("""
+INSERT OR REPLACE INTO _extract_cache (text_hash, schema_hash, config_hash, fields_json, created_ts)
+VALUES (?, ?, ?, ?, ?)
+""", (*key, fields_json, datetime.now(timezone.utc).isoformat(timespec="seconds")))
 
 
 def fetch_history(db_path: str, limit: int) -> List[Tuple[Any, ...]]:
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("""
+    # Read-only and outside _get_conn: no WAL switch or schema DDL on a DB we only report from.
+    conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        return conn.execute("""
 SELECT run_ts, lead_id, account_name, industry, fit_score, intent_score, stage, out_dir
 FROM lead_runs ORDER BY id DESC LIMIT ?
-""", (limit,))
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+""", (limit,)).fetchall()
+    finally:
+        conn.close()
 
 
 # -----------------------------
 # CRM export (Salesforce-style mapping)
 # -----------------------------
-def export_salesforce_payload(fields: Dict[str, Any], scores: Dict[str, Any], cfg: Dict[str, Any]) -> Dict[str, Any]:
-    mapping = cfg.get("crm_export", {}).get("salesforce", {}).get("Lead", {})
+def _sf_summary_text(fields: Dict[str, Any], scores: Dict[str, Any]) -> str:
     # Build a short description/summary
-    summary_lines = [
+    open_questions = fields.get("open_questions")
+    return "\n".join((
         f"Use case: {fields.get('use_case')}",
         f"Pain points: {', '.join(fields.get('pain_points', []))}",
         f"Must-haves: {', '.join(fields.get('must_haves', []))}",
-        f"Open questions: {', '.join(fields.get('open_questions', []))}" if fields.get("open_questions") else "Open questions: None"
-    ]
-    summary_text = "\n".join(summary_lines).strip()
+        f"Open questions: {', '.join(open_questions)}" if open_questions else "Open questions: None",
+    )).strip()
+
+
+SfGetter = Callable[[Dict[str, Any], Dict[str, Any]], Any]
+SfEmitter = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+
+
+def _sf_getter(src_key: str) -> SfGetter:
+    if src_key == "summary_text":
+        return _sf_summary_text
+    if src_key in ("stage", "rating"):
+        return lambda f, s: s.get(src_key)
+    return lambda f, s: f.get(src_key, "Unknown")
 
-    payload: Dict[str, Any] = {}
-    for sf_field, src_key in mapping.items():
-        if src_key == "summary_text":
-            payload[sf_field] = summary_text
-        elif src_key == "stage":
-            payload[sf_field] = scores.get("stage")
-        elif src_key == "rating":
-            payload[sf_field] = scores.get("rating")
-        else:
-            payload[sf_field] = fields.get(src_key, "Unknown")
 
-    # Include external id hint
-    payload["External_Id__c"] = fields.get("lead_id")
-    return {"object": "Lead", "action": "upsert", "payload": payload}
+@functools.lru_cache(maxsize=8)
+def _build_sf_emitter(mapping_items: Tuple[Tuple[str, str], ...]) -> SfEmitter:
+    # Resolve every Salesforce field to a getter once per mapping; the emitted
+    # function is then a single zip over fixed field/getter tuples per lead.
+    sf_fields = tuple(sf_field for sf_field, _ in mapping_items) + ("External_Id__c",)
+    getters = tuple(_sf_getter(src_key) for _, src_key in mapping_items) + (lambda f, s: f.get("lead_id"),)
+
+    def emit(fields: Dict[str, Any], scores: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(zip(sf_fields, [getter(fields, scores) for getter in getters]))
+
+    return emit
+
+
+def _emit_payload(cfg: Dict[str, Any]) -> SfEmitter:
+    """Return a (fields, scores) -> Salesforce Lead payload function for this config."""
+    mapping = cfg.get("crm_export", {}).get("salesforce", {}).get("Lead", {})
+    return _build_sf_emitter(tuple(mapping.items()))
+
+
+def export_salesforce_payload(fields: Dict[str, Any], scores: Dict[str, Any], cfg: Dict[str, Any]) -> Dict[str, Any]:
+    # External_Id__c (lead_id) is always emitted as the upsert key.
+    return {"object": "Lead", "action": "upsert", "payload": _emit_payload(cfg)(fields, scores)}
 
 
 # -----------------------------
 # Commands
 # -----------------------------
-def cmd_run(args: argparse.Namespace, logger: logging.Logger) -> None:
-    cfg = load_config(args.config)
-    schema_json = read_text_file(args.schema)
-
-    raw_text = read_stdin() if args.stdin else read_text_file(args.input)
+def process_lead(
+    raw_text: str,
+    schema_json: str,
+    cfg: Dict[str, Any],
+    logger: logging.Logger,
+    lead_id: str = "",
+    source: str = "",
+    redact: bool = True,
+    db_path: str = "",
+    use_cache: bool = True,
+) -> Tuple[Dict[str, Any], Dict[str, Any], bool]:
+    """Redact -> extract -> score one lead; returns (fields, scores, pii_hit)."""
     # Always hash raw text (but don't persist raw full text)
     raw_hash = text_sha256(raw_text)
 
     processed_text = raw_text
     pii_hit = False
-    if cfg.get("redact_pii", True) and not args.no_redact:
+    if cfg.get("redact_pii", True) and redact:
         processed_text, pii_hit = redact_pii(raw_text)
 
-    lead_id = args.lead_id or f"LEAD-{uuid.uuid4().hex[:8].upper()}"
+    lead_id = lead_id or f"LEAD-{uuid.uuid4().hex[:8].upper()}"
     excerpt_len = int(cfg.get("max_excerpt_chars", 500))
     excerpt = processed_text[:excerpt_len] + ("..." if len(processed_text) > excerpt_len else "")
 
-    fields = extract_fields(processed_text, schema_json, cfg, logger)
+    fields = extract_fields(processed_text, schema_json, cfg, logger, db_path=db_path, use_cache=use_cache)
     fields["lead_id"] = lead_id
-    fields["source"] = args.source or fields.get("source", "Unknown")
-    fields["pii_redacted"] = bool(cfg.get("redact_pii", True) and not args.no_redact)
+    fields["source"] = source or fields.get("source", "Unknown")
+    fields["pii_redacted"] = bool(cfg.get("redact_pii", True) and redact)
     fields["text_hash"] = raw_hash
     fields["raw_text_excerpt"] = excerpt
 
     scores = score_and_stage(fields, cfg)
+    return fields, scores, pii_hit
+
+
+def write_lead_outputs(out_dir: str, fields: Dict[str, Any], scores: Dict[str, Any], owner: str, lang: str) -> None:
     actions = generate_actions(fields, scores)
-    owner = args.owner or cfg.get("owner", "You")
-    lang = args.lang or cfg.get("language", "ZH")
     email = generate_followup_email(fields, scores, owner=owner, lang=lang)
 
-    ensure_dir(args.out)
-    write_json(os.path.join(args.out, "fields.json"), fields)
-    write_json(os.path.join(args.out, "scores.json"), scores)
-    write_text(os.path.join(args.out, "next_actions.txt"), "\n".join(actions))
-    write_text(os.path.join(args.out, "follow_up_email.txt"), email)
-    report = build_report_md(fields, scores, actions, email)
-    write_text(os.path.join(args.out, "report.md"), report)
+    report = build_report_md(fields, scores, actions, email) + "\n"
+    ensure_dir(out_dir)
+    for name, payload in (
+        ("fields.json", json_bytes(fields)),
+        ("scores.json", json_bytes(scores)),
+        ("next_actions.txt", "\n".join(actions).encode("utf-8")),
+        ("follow_up_email.txt", email.encode("utf-8")),
+        ("report.md", report.encode("utf-8")),
+    ):
+        write_bytes(os.path.join(out_dir, name), payload)
+
+
+def build_run_record(fields: Dict[str, Any], scores: Dict[str, Any], input_source: str, out_dir: str) -> Dict[str, Any]:
+    return {
+        "run_ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "lead_id": fields.get("lead_id"),
+        "input_source": input_source,
+        "account_name": fields.get("account_name"),
+        "industry": fields.get("industry"),
+        "budget": fields.get("budget"),
+        "timeline": fields.get("timeline"),
+        "fit_score": scores.get("fit_score"),
+        "intent_score": scores.get("intent_score"),
+        "stage": scores.get("stage"),
+        "out_dir": out_dir
+    }
+
+
+def log_pattern_hits(logger: logging.Logger) -> None:
+    if PATTERN_HITS is None:
+        return
+    for (name, idx), n in sorted(PATTERN_HITS.items(), key=lambda kv: (kv[0][0], -1 if kv[0][1] is None else kv[0][1])):
+        logger.info(f"Pattern profile: {name}[{'miss' if idx is None else idx}] = {n}")
+
+
+@dataclass(frozen=True)
+class BatchContext:
+    """Everything a (possibly out-of-process) batch worker needs besides the file path."""
+    cfg: Dict[str, Any]
+    schema_json: str
+    out_root: str
+    owner: str
+    lang: str
+    source: str
+    redact: bool
+    db_path: str
+    max_input_bytes: int
+    use_cache: bool = True
+
+
+def lead_files(in_dir: str) -> List[str]:
+    return [str(p) for p in sorted(Path(in_dir).glob("*.txt"))]
+
+
+def process_lead_file(
+    path: str, ctx: BatchContext, logger: logging.Logger
+) -> Optional[Tuple[Dict[str, Any], bool]]:
+    """
+    Process one lead file into <out_root>/<name>/; returns (run record, pii_hit).
+    A failing file is logged and returns None so the rest of the batch still runs.
+    """
+    try:
+        raw_text = read_input_text(path, ctx.max_input_bytes, logger)
+        fields, scores, pii_hit = process_lead(
+            raw_text, ctx.schema_json, ctx.cfg, logger, source=ctx.source, redact=ctx.redact,
+            db_path=ctx.db_path, use_cache=ctx.use_cache,
+        )
+        out_dir = os.path.join(ctx.out_root, Path(path).stem)
+        write_lead_outputs(out_dir, fields, scores, ctx.owner, ctx.lang)
+    except Exception:
+        logger.exception(f"Failed to process {path}")
+        return None
+    return build_run_record(fields, scores, path, out_dir), pii_hit
+
+
+def track_batch_results(
+    results: List[Optional[Tuple[Dict[str, Any], bool]]], db_path: str
+) -> Tuple[int, int, bool]:
+    """Insert the successful run records; returns (succeeded, failed, any pii_hit)."""
+    done = [result for result in results if result is not None]
+    if db_path and done:
+        insert_runs_batch(db_path, [record for record, _ in done])
+    return len(done), len(results) - len(done), any(hit for _, hit in done)
+
+
+_worker_ctx: Optional[BatchContext] = None
+_worker_logger: Optional[logging.Logger] = None
+
+
+def _init_batch_worker(ctx: BatchContext, log_level: str) -> None:
+    global _worker_ctx, _worker_logger
+    # A forked worker must not reuse the parent's SQLite connection; open its own on demand.
+    _get_conn.cache_clear()
+    _worker_ctx = ctx
+    _worker_logger = setup_logger(log_level)
+
+
+def _batch_worker(path: str) -> Optional[Tuple[Dict[str, Any], bool]]:
+    assert _worker_ctx is not None and _worker_logger is not None
+    return process_lead_file(path, _worker_ctx, _worker_logger)
+
+
+def cmd_run(args: argparse.Namespace, logger: logging.Logger) -> None:
+    global PATTERN_HITS
+    if args.profile_patterns:
+        PATTERN_HITS = Counter()
+    cfg = load_config(args.config)
+    schema_json = read_text_file(args.schema)
+    owner = args.owner or cfg.get("owner", "You")
+    lang = args.lang or cfg.get("language", "ZH")
+    max_input_bytes = int(cfg.get("max_input_bytes", DEFAULT_MAX_INPUT_BYTES))
+
+    if args.batch_dir:
+        # One process for the whole directory: imports and compiled patterns are reused.
+        ctx = BatchContext(
+            cfg=cfg, schema_json=schema_json, out_root=args.out, owner=owner, lang=lang,
+            source=args.source, redact=not args.no_redact, db_path=args.db, max_input_bytes=max_input_bytes,
+            use_cache=not args.no_cache,
+        )
+        paths = lead_files(args.batch_dir)
+        results = [process_lead_file(path, ctx, logger) for path in paths]
+        succeeded, failed, pii_hit = track_batch_results(results, args.db)
+        logger.info(f"OK: {succeeded} leads from {args.batch_dir} saved under {args.out}")
+    else:
+        failed = 0
+        raw_text = read_input_text(None if args.stdin else args.input, max_input_bytes, logger)
+        fields, scores, pii_hit = process_lead(
+            raw_text, schema_json, cfg, logger,
+            lead_id=args.lead_id, source=args.source, redact=not args.no_redact, db_path=args.db,
+            use_cache=not args.no_cache,
+        )
+        write_lead_outputs(args.out, fields, scores, owner, lang)
+
+        # Track to DB
+        if args.db:
+            insert_run(args.db, build_run_record(fields, scores, "stdin" if args.stdin else args.input, args.out))
+        logger.info(f"OK: outputs saved to {args.out}")
 
-    # Track to DB
     if args.db:
-        record = {
-            "run_ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
-            "lead_id": lead_id,
-            "input_source": "stdin" if args.stdin else args.input,
-            "account_name": fields.get("account_name"),
-            "industry": fields.get("industry"),
-            "budget": fields.get("budget"),
-            "timeline": fields.get("timeline"),
-            "fit_score": scores.get("fit_score"),
-            "intent_score": scores.get("intent_score"),
-            "stage": scores.get("stage"),
-            "out_dir": args.out
-        }
-        insert_run(args.db, record)
-
-    logger.info(f"OK: outputs saved to {args.out}")
+        logger.info(f"OK: tracked in DB {args.db}")
+    if pii_hit:
+        logger.info("Note: PII-like strings were redacted in outputs.")
+    log_pattern_hits(logger)
+    if failed:
+        raise SystemExit(f"ERROR: {failed} of {len(paths)} leads failed; see the log above.")
+
+
+def cmd_run_batch(args: argparse.Namespace, logger: logging.Logger) -> None:
+    cfg = load_config(args.config)
+    ctx = BatchContext(
+        cfg=cfg,
+        schema_json=read_text_file(args.schema),
+        out_root=args.out_dir,
+        owner=args.owner or cfg.get("owner", "You"),
+        lang=args.lang or cfg.get("language", "ZH"),
+        source=args.source,
+        redact=not args.no_redact,
+        db_path=args.db,
+        max_input_bytes=int(cfg.get("max_input_bytes", DEFAULT_MAX_INPUT_BYTES)),
+        use_cache=not args.no_cache,
+    )
+    paths = lead_files(args.in_dir)
+    workers = args.workers or os.cpu_count() or 1
+
+    if workers <= 1 or len(paths) <= 1:
+        results = [process_lead_file(path, ctx, logger) for path in paths]
+    else:
+        # Extraction is CPU-bound: fan files out to worker processes, each writing its own
+        # outputs; only the run records come back to be tracked in one transaction.
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_batch_worker, initargs=(ctx, args.log_level)
+        ) as executor:
+            chunksize = max(1, len(paths) // (workers * 4))
+            results = list(executor.map(_batch_worker, paths, chunksize=chunksize))
+
+    succeeded, failed, pii_hit = track_batch_results(results, args.db)
+    logger.info(f"OK: {succeeded} leads from {args.in_dir} saved under {args.out_dir}")
     if args.db:
         logger.info(f"OK: tracked in DB {args.db}")
     if pii_hit:
         logger.info("Note: PII-like strings were redacted in outputs.")
+    if failed:
+        raise SystemExit(f"ERROR: {failed} of {len(paths)} leads failed; see the log above.")
+
+
+def cmd_serve(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """
+    Long-running mode: one JSON request per stdin line -> one JSON response per stdout line.
+    Request: {"text": "...", "lead_id": "...", "source": "..."} (only "text" is required).
+    """
+    cfg = load_config(args.config)
+    schema_json = read_text_file(args.schema)
+    max_bytes = int(cfg.get("max_input_bytes", DEFAULT_MAX_INPUT_BYTES))
+    logger.info("Serving: reading JSON lines from stdin")
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            req = json.loads(line)
+        except ValueError as e:
+            print(json.dumps({"error": f"invalid JSON: {e}"}), flush=True)
+            continue
+        if not isinstance(req, dict) or not isinstance(req.get("text"), str):
+            print(json.dumps({"error": "request must be an object with a string 'text'"}), flush=True)
+            continue
+        try:
+            # Same byte cap as `run`; lone surrogates fail the decode and get an error line.
+            text = _decode_bounded(req["text"].encode("utf-8", "surrogatepass"), max_bytes, logger)
+            fields, scores, _ = process_lead(
+                text, schema_json, cfg, logger,
+                lead_id=str(req.get("lead_id") or ""), source=str(req.get("source") or ""),
+                redact=not args.no_redact, db_path=args.db, use_cache=not args.no_cache,
+            )
+        except Exception as e:
+            logger.exception("Serve request failed")
+            print(json.dumps({"error": f"processing failed: {e}"}), flush=True)
+            continue
+        print(json.dumps({"fields": fields, "scores": scores}, ensure_ascii=False), flush=True)
 
 
 def cmd_export_crm(args: argparse.Namespace, logger: logging.Logger) -> None:
@@ -670,6 +1263,9 @@ def cmd_export_crm(args: argparse.Namespace, logger: logging.Logger) -> None:
 
 
 def cmd_history(args: argparse.Namespace, logger: logging.Logger) -> None:
+    # Opening a connection would create an empty DB for a mistyped path.
+    if not os.path.exists(args.db):
+        raise SystemExit(f"DB not found: {args.db}")
     rows = fetch_history(args.db, args.limit)
     if not rows:
         print("(no history)")
@@ -695,6 +1291,7 @@ def build_parser() -> argparse.ArgumentParser:
     run = sub.add_parser("run", help="Run extraction + scoring + action/email generation")
     run.add_argument("--input", type=str, help="Path to input text file")
     run.add_argument("--stdin", action="store_true", help="Read input from stdin")
+    run.add_argument("--batch-dir", type=str, default="", help="Process every *.txt in this directory (outputs go to <out>/<name>/)")
     run.add_argument("--out", type=str, required=True, help="Output directory")
     run.add_argument("--db", type=str, default="", help="SQLite DB path for tracking (optional)")
     run.add_argument("--owner", type=str, default="", help="Name shown in follow-up email signature")
@@ -702,6 +1299,9 @@ def build_parser() -> argparse.ArgumentParser:
     run.add_argument("--source", type=str, default="", help="Lead source (e.g., inbound, event, referral)")
     run.add_argument("--lead-id", type=str, default="", help="Optional lead id (otherwise auto-generated)")
     run.add_argument("--no-redact", action="store_true", help="Disable PII redaction (NOT recommended)")
+    run.add_argument("--no-cache", action="store_true", help="Always re-extract; skip the extraction cache")
+    run.add_argument("--profile-patterns", action="store_true",
+                     help="Log which field pattern matched per lead (cached extractions are not counted)")
     run.set_defaults(func=cmd_run)
 
     exp = sub.add_parser("export-crm", help="Export CRM payload from an output directory")
@@ -710,6 +1310,24 @@ def build_parser() -> argparse.ArgumentParser:
     exp.add_argument("--output", type=str, default="", help="Output file path (default: <out>/crm_payload.json)")
     exp.set_defaults(func=cmd_export_crm)
 
+    batch = sub.add_parser("run-batch", help="Run every *.txt lead in a directory across worker processes")
+    batch.add_argument("--in-dir", type=str, required=True, help="Directory of input .txt files")
+    batch.add_argument("--out-dir", type=str, required=True, help="Output root (one <name>/ subdirectory per lead)")
+    batch.add_argument("--db", type=str, default="", help="SQLite DB path for tracking (optional)")
+    batch.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count; 1 = in-process)")
+    batch.add_argument("--owner", type=str, default="", help="Name shown in follow-up email signature")
+    batch.add_argument("--lang", type=str, default="", help="ZH or BILINGUAL")
+    batch.add_argument("--source", type=str, default="", help="Lead source (e.g., inbound, event, referral)")
+    batch.add_argument("--no-redact", action="store_true", help="Disable PII redaction (NOT recommended)")
+    batch.add_argument("--no-cache", action="store_true", help="Always re-extract; skip the extraction cache")
+    batch.set_defaults(func=cmd_run_batch)
+
+    serve = sub.add_parser("serve", help="Process JSON-lines requests from stdin in one long-running process")
+    serve.add_argument("--db", type=str, default="", help="SQLite DB path for the extraction cache (optional)")
+    serve.add_argument("--no-redact", action="store_true", help="Disable PII redaction (NOT recommended)")
+    serve.add_argument("--no-cache", action="store_true", help="Always re-extract; skip the extraction cache")
+    serve.set_defaults(func=cmd_serve)
+
     hist = sub.add_parser("history", help="Show recent runs from tracking DB")
     hist.add_argument("--db", type=str, required=True, help="SQLite DB path")
     hist.add_argument("--limit", type=int, default=10, help="Number of rows to show")
@@ -722,13 +1340,21 @@ def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
     logger = setup_logger(args.log_level)
+    log_hash_backend(logger)
 
     # Validation for run
     if args.command == "run":
-        if args.stdin and args.input:
-            parser.error("Use only one: --input or --stdin.")
-        if (not args.stdin) and (not args.input):
-            parser.error("Either --input or --stdin is required.")
+        sources = [bool(args.input), args.stdin, bool(args.batch_dir)]
+        if sum(sources) > 1:
+            parser.error("Use only one: --input, --stdin or --batch-dir.")
+        if not any(sources):
+            parser.error("One of --input, --stdin or --batch-dir is required.")
+        if args.batch_dir and args.lead_id:
+            parser.error("--lead-id cannot be combined with --batch-dir.")
+        if args.batch_dir and not os.path.isdir(args.batch_dir):
+            parser.error(f"--batch-dir is not a directory: {args.batch_dir}")
+    if args.command == "run-batch" and not os.path.isdir(args.in_dir):
+        parser.error(f"--in-dir is not a directory: {args.in_dir}")
 
     args.func(args, logger)
 
@@ -0,0 +1,133 @@
+import json
+import sqlite3
+import subprocess
+import sys
+
+
+def test_serve_answers_each_json_line() -> None:
+    requests = "\n".join([
+        json.dumps({"text": "行业：跨境物流\n- 预算：5 万", "lead_id": "LEAD-1"}, ensure_ascii=False),
+        "not json",
+    ]) + "\n"
+    proc = subprocess.run(
+        [sys.executable, "sales_workflow_cli.py", "serve"],
+        input=requests, capture_output=True, text=True, encoding="utf-8", check=True,
+    )
+    first, second = [json.loads(line) for line in proc.stdout.splitlines()]
+
+    assert first["fields"]["lead_id"] == "LEAD-1"
+    assert first["fields"]["industry"] == "跨境物流"
+    assert first["fields"]["budget"] == "5 万"
+    assert "stage" in first["scores"]
+    assert "error" in second
+
+
+def test_serve_survives_a_failing_request() -> None:
+    requests = "\n".join([
+        json.dumps({"text": "a\ud800b"}),
+        json.dumps({"text": "行业：跨境物流", "lead_id": "LEAD-2"}, ensure_ascii=False),
+    ]) + "\n"
+    proc = subprocess.run(
+        [sys.executable, "sales_workflow_cli.py", "serve"],
+        input=requests, capture_output=True, text=True, encoding="utf-8", check=True,
+    )
+    first, second = [json.loads(line) for line in proc.stdout.splitlines()]
+
+    assert "error" in first
+    assert second["fields"]["lead_id"] == "LEAD-2"
+
+
+def test_run_batch_dir_writes_one_output_per_file(tmp_path) -> None:
+    out = tmp_path / "out"
+    subprocess.run(
+        [sys.executable, "sales_workflow_cli.py", "run", "--batch-dir", "examples", "--out", str(out)],
+        capture_output=True, check=True,
+    )
+    assert sorted(p.name for p in out.iterdir()) == ["chat1", "chat2", "chat3"]
+    assert (out / "chat2" / "report.md").exists()
+
+
+def test_run_batch_parallel_tracks_every_lead(tmp_path) -> None:
+    out = tmp_path / "out"
+    db = tmp_path / "tracking.sqlite"
+    subprocess.run(
+        [
+            sys.executable, "sales_workflow_cli.py", "run-batch",
+            "--in-dir", "examples", "--out-dir", str(out), "--db", str(db), "--workers", "2",
+        ],
+        capture_output=True, check=True,
+    )
+    assert sorted(p.name for p in out.iterdir()) == ["chat1", "chat2", "chat3"]
+
+    history = subprocess.run(
+        [sys.executable, "sales_workflow_cli.py", "history", "--db", str(db)],
+        capture_output=True, text=True, encoding="utf-8", check=True,
+    )
+    assert len(history.stdout.splitlines()) == 1 + 3
+
+
+def test_run_batch_tracks_good_leads_when_one_fails(tmp_path) -> None:
+    in_dir = tmp_path / "in"
+    in_dir.mkdir()
+    (in_dir / "bad.txt").write_bytes(b"\xff\xfe not utf-8")
+    (in_dir / "good.txt").write_text("行业：跨境物流", encoding="utf-8")
+    db = tmp_path / "tracking.sqlite"
+    proc = subprocess.run(
+        [
+            sys.executable, "sales_workflow_cli.py", "run-batch",
+            "--in-dir", str(in_dir), "--out-dir", str(tmp_path / "out"), "--db", str(db), "--workers", "1",
+        ],
+        capture_output=True,
+    )
+    assert proc.returncode != 0
+
+    history = subprocess.run(
+        [sys.executable, "sales_workflow_cli.py", "history", "--db", str(db)],
+        capture_output=True, text=True, encoding="utf-8", check=True,
+    )
+    assert len(history.stdout.splitlines()) == 1 + 1
+
+
+def test_run_batch_rejects_missing_in_dir(tmp_path) -> None:
+    proc = subprocess.run(
+        [sys.executable, "sales_workflow_cli.py", "run-batch", "--in-dir", str(tmp_path / "nope")],
+        capture_output=True,
+    )
+    assert proc.returncode == 2
+
+
+def test_history_rejects_missing_db(tmp_path) -> None:
+    db = tmp_path / "typo.sqlite"
+    proc = subprocess.run(
+        [sys.executable, "sales_workflow_cli.py", "history", "--db", str(db)],
+        capture_output=True,
+    )
+    assert proc.returncode != 0
+    assert not db.exists()
+
+
+def test_history_leaves_db_untouched(tmp_path) -> None:
+    db = tmp_path / "tracking.sqlite"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE lead_runs (id INTEGER PRIMARY KEY AUTOINCREMENT, run_ts TEXT NOT NULL, "
+                 "lead_id TEXT NOT NULL, input_source TEXT, account_name TEXT, industry TEXT, budget TEXT, "
+                 "timeline TEXT, fit_score INTEGER, intent_score INTEGER, stage TEXT, out_dir TEXT)")
+    conn.execute("INSERT INTO lead_runs (run_ts, lead_id) VALUES ('2024-01-01T00:00:00+00:00', 'LEAD-1')")
+    conn.commit()
+    conn.close()
+    before = db.read_bytes()
+
+    history = subprocess.run(
+        [sys.executable, "sales_workflow_cli.py", "history", "--db", str(db)],
+        capture_output=True, text=True, encoding="utf-8", check=True,
+    )
+    assert "LEAD-1" in history.stdout
+    assert db.read_bytes() == before
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["tracking.sqlite"]
+
+    conn = sqlite3.connect(db)
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    conn.close()
+    assert "_extract_cache" not in tables
+    assert journal_mode == "delete"
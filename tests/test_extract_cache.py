@@ -0,0 +1,55 @@
+import logging
+import sqlite3
+
+import sales_workflow_cli
+from sales_workflow_cli import extract_fields
+
+
+def test_extract_fields_reuses_cached_result(tmp_path, monkeypatch) -> None:
+    db = str(tmp_path / "tracking.sqlite")
+    logger = logging.getLogger("test")
+    text = "客户：上海某某科技有限公司\n- 预算：5 万"
+    first = extract_fields(text, "{}", {"redact_pii": True}, logger, db_path=db)
+
+    # Drop the in-process memo so the second call has to read the DB table.
+    sales_workflow_cli._extract_memo.clear()
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("extraction should have been served from cache")
+
+    monkeypatch.setattr(sales_workflow_cli, "_extract_uncached", _fail)
+    second = extract_fields(text, "{}", {"redact_pii": True}, logger, db_path=db)
+    assert second == first
+    assert second is not first
+
+
+def test_extract_cache_key_tracks_source_hash(monkeypatch) -> None:
+    before = sales_workflow_cli.extract_cache_key("text", "{}", {})
+    monkeypatch.setattr(sales_workflow_cli, "EXTRACT_CODE_HASH", "edited")
+    assert sales_workflow_cli.extract_cache_key("text", "{}", {})[2] != before[2]
+
+
+def test_extract_fields_no_cache_always_extracts(tmp_path, monkeypatch) -> None:
+    db = str(tmp_path / "tracking.sqlite")
+    logger = logging.getLogger("test")
+    text = "客户：上海某某科技有限公司"
+    extract_fields(text, "{}", {}, logger, db_path=db)
+
+    calls = []
+    monkeypatch.setattr(sales_workflow_cli, "_extract_uncached", lambda *args: calls.append(args) or {})
+    assert extract_fields(text, "{}", {}, logger, db_path=db, use_cache=False) == {}
+    assert len(calls) == 1
+
+
+
+def test_extract_fields_survives_cache_db_errors(tmp_path, monkeypatch) -> None:
+    logger = logging.getLogger("test")
+
+    def _locked(*_args, **_kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(sales_workflow_cli, "fetch_cached_fields", _locked)
+    monkeypatch.setattr(sales_workflow_cli, "store_cached_fields", _locked)
+    sales_workflow_cli._extract_memo.clear()
+    fields = extract_fields("行业：跨境物流", "{}", {}, logger, db_path=str(tmp_path / "tracking.sqlite"))
+    assert fields["industry"] == "跨境物流"
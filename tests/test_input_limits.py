@@ -0,0 +1,24 @@
+import logging
+
+from sales_workflow_cli import read_input_text
+
+
+def test_read_input_text_truncates_on_codepoint_boundary(tmp_path) -> None:
+    path = tmp_path / "lead.txt"
+    path.write_text("预算：5 万", encoding="utf-8")
+    logger = logging.getLogger("test")
+
+    # 4 bytes cuts the second 3-byte character in half.
+    assert read_input_text(str(path), 4, logger) == "预"
+    assert read_input_text(str(path), 1024, logger) == "预算：5 万"
+
+
+def test_read_input_text_normalizes_crlf(tmp_path) -> None:
+    lf = tmp_path / "lf.txt"
+    crlf = tmp_path / "crlf.txt"
+    lf.write_bytes("行业：物流\n预算：5 万\n".encode("utf-8"))
+    crlf.write_bytes("行业：物流\r\n预算：5 万\r\n".encode("utf-8"))
+    logger = logging.getLogger("test")
+
+    assert read_input_text(str(crlf), 1024, logger) == read_input_text(str(lf), 1024, logger)
+    assert read_input_text(str(crlf), 20, logger) == "行业：物流\n预"
@@ -1,4 +1,9 @@
-from sales_workflow_cli import heuristic_extract
+from pathlib import Path
+
+import pytest
+
+import sales_workflow_cli
+from sales_workflow_cli import heuristic_extract, scan_keywords
 
 def test_timeline_and_bot_classification():
     text = """预算/时间线：
@@ -11,3 +16,45 @@ Nice-to-have：
     assert "2 周内" in fields["timeline"] or fields["timeline"].startswith("希望 2")
     assert "bot" in fields["nice_to_haves"]
     assert "bot" not in fields["must_haves"]
+
+
+def test_overlapping_keywords_all_detected():
+    text = "跟进节奏很乱，还有线索超过48小时未跟进，需要 Workflow 和 CRM"
+    fields = heuristic_extract(text)
+    assert fields["pain_points"] == ["节奏很乱", "未跟进", "很乱"]
+    assert fields["must_haves"] == ["workflow", "CRM", "超过48小时未跟进"]
+
+
+def test_keyword_prefix_of_longer_keyword_detected():
+    fields = heuristic_extract("希望能导出Excel/CSV")
+    assert "导出Excel/CSV" in fields["must_haves"]
+    assert "导出" in fields["nice_to_haves"]
+
+
+def _fallback_scan(monkeypatch, text):
+    with monkeypatch.context() as m:
+        m.setattr(sales_workflow_cli, "_KW_AUTOMATON", None)
+        m.setattr(sales_workflow_cli, "_KW_SET", None)
+        return scan_keywords(text)
+
+
+def test_re2_keyword_set_matches_re_fallback(monkeypatch):
+    pytest.importorskip("re2")
+    kw_set, kw_set_ids = sales_workflow_cli._build_keyword_set()
+    for path in sorted(Path("examples").glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        expected = _fallback_scan(monkeypatch, text)
+        monkeypatch.setattr(sales_workflow_cli, "_KW_AUTOMATON", None)
+        monkeypatch.setattr(sales_workflow_cli, "_KW_SET", kw_set)
+        monkeypatch.setattr(sales_workflow_cli, "_KW_SET_IDS", kw_set_ids)
+        assert scan_keywords(text) == expected, path.name
+
+
+def test_aho_corasick_automaton_matches_re_fallback(monkeypatch):
+    pytest.importorskip("ahocorasick")
+    automaton = sales_workflow_cli._build_keyword_automaton()
+    for path in sorted(Path("examples").glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        expected = _fallback_scan(monkeypatch, text)
+        monkeypatch.setattr(sales_workflow_cli, "_KW_AUTOMATON", automaton)
+        assert scan_keywords(text) == expected, path.name
@@ -0,0 +1,22 @@
+from sales_workflow_cli import redact_pii
+
+
+def test_redacts_each_pii_kind() -> None:
+    text = "Email a.b@example.com, call 555-123-4567, ID 11010519491231002X"
+    redacted, hit = redact_pii(text)
+    assert hit
+    assert "[REDACTED_EMAIL]" in redacted
+    assert "[REDACTED_PHONE]" in redacted
+    assert "[REDACTED_ID]" in redacted
+    assert "example.com" not in redacted
+
+
+def test_numeric_email_is_redacted_as_email() -> None:
+    redacted, hit = redact_pii("mail 13812345678@qq.com please")
+    assert hit
+    assert redacted == "mail [REDACTED_EMAIL] please"
+
+
+def test_no_pii_returns_text_unchanged() -> None:
+    text = "客户：希望两周内上线 workflow"
+    assert redact_pii(text) == (text, False)
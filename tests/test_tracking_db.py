@@ -0,0 +1,22 @@
+from sales_workflow_cli import fetch_history, insert_run, insert_runs_batch
+
+
+def test_insert_runs_batch_and_history(tmp_path) -> None:
+    db = str(tmp_path / "tracking.sqlite")
+    records = [
+        {
+            "run_ts": f"2024-01-0{i}T00:00:00+00:00",
+            "lead_id": f"LEAD-{i}",
+            "input_source": "test",
+            "fit_score": 50 + i,
+            "intent_score": 60,
+            "stage": "Early (Needs discovery)",
+            "out_dir": "out",
+        }
+        for i in range(1, 4)
+    ]
+    insert_runs_batch(db, records)
+    insert_run(db, {**records[0], "lead_id": "LEAD-9"})
+
+    rows = fetch_history(db, 10)
+    assert [r[1] for r in rows] == ["LEAD-9", "LEAD-3", "LEAD-2", "LEAD-1"]